@@ -1,8 +1,87 @@
+import time
+
 import chess
-import random
+import chess.polyglot
+
+
+# Default piece values for static_exchange, in pawns
+EXCHANGE_VALUES = {
+    chess.PAWN: 1,
+    chess.KNIGHT: 3,
+    chess.BISHOP: 3,
+    chess.ROOK: 5,
+    chess.QUEEN: 9,
+    chess.KING: 100
+}
+
+
+def static_exchange(board, move, values=None):
+    """Static exchange evaluation of a capture for the side making it.
+
+    Plays out the exchange on the target square with the least valuable
+    attacker of each side (found with board.attackers_mask, so x-ray attackers
+    behind a capturing slider join in), where either side may stop capturing.
+    Returns the material balance in the units of values (pawn = 1 by default).
+    """
+    if values is None:
+        values = EXCHANGE_VALUES
+    target = move.to_square
+    occupied = board.occupied ^ chess.BB_SQUARES[move.from_square]
+
+    if board.is_en_passant(move):
+        gains = [values[chess.PAWN]]
+        occupied ^= chess.BB_SQUARES[target - 8 if board.turn == chess.WHITE else target + 8]
+    else:
+        gains = [values.get(board.piece_type_at(target), 0)]
+
+    # Value of the piece standing on the target square after each capture
+    on_square = values[move.promotion or board.piece_type_at(move.from_square)]
+    if move.promotion:
+        gains[0] += values[move.promotion] - values[chess.PAWN]
+
+    side = not board.turn
+    while True:
+        attackers = board.attackers_mask(side, target, occupied) & occupied
+        if not attackers:
+            break
+        for piece_type in chess.PIECE_TYPES:
+            candidates = attackers & board.pieces_mask(piece_type, side)
+            if candidates:
+                square = chess.lsb(candidates)
+                break
+        # The king may only recapture if the square is no longer defended
+        if piece_type == chess.KING and board.attackers_mask(not side, target, occupied ^ chess.BB_SQUARES[square]) & occupied:
+            break
+        gains.append(on_square - gains[-1])
+        on_square = values[piece_type]
+        occupied ^= chess.BB_SQUARES[square]
+        side = not side
+
+    # Either side may stop the exchange when continuing would lose material
+    for index in range(len(gains) - 1, 0, -1):
+        gains[index - 1] = -max(-gains[index - 1], gains[index])
+    return gains[0]
+
+
+class SearchAborted(Exception):
+    """Raised inside the search when the node or time budget of a limited search is used up."""
+
+
+class AnalysisLine:
+    """A ranked root move with its score and principal variation."""
+
+    def __init__(self, move, score, pv, depth):
+        self.move = move
+        self.score = score
+        self.pv = pv
+        self.depth = depth
+
+    def __repr__(self):
+        return f"AnalysisLine(move={self.move.uci()}, score={self.score}, pv={[move.uci() for move in self.pv]}, depth={self.depth})"
+
 
 class ChessAI:
-    def __init__(self, color):
+    def __init__(self, color, tapered_eval=True, contempt=0.0, deterministic=False, recorder=None):
         self.color = color
         self.calculations = 0
         self.calculations_alpha_beta = 0
@@ -19,8 +98,6 @@ class ChessAI:
             [0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0]
         ]
         
-        self.pawn_eval_black = self._reverse_array(self.pawn_eval_white)
-        
         self.knight_eval_white = [
             [-5.0, -4.0, -3.0, -3.0, -3.0, -3.0, -4.0, -5.0],
             [-4.0, -2.0,  0.0,  0.5,  0.5,  0.0, -2.0, -4.0],
@@ -32,8 +109,6 @@ class ChessAI:
             [-5.0, -4.0, -3.0, -3.0, -3.0, -3.0, -4.0, -5.0]
         ]
         
-        self.knight_eval_black = self._reverse_array(self.knight_eval_white)
-        
         self.bishop_eval_white = [
             [-2.0, -1.0, -1.0, -1.0, -1.0, -1.0, -1.0, -2.0],
             [-1.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0, -1.0],
@@ -45,8 +120,6 @@ class ChessAI:
             [-2.0, -1.0, -1.0, -1.0, -1.0, -1.0, -1.0, -2.0]
         ]
         
-        self.bishop_eval_black = self._reverse_array(self.bishop_eval_white)
-        
         self.rook_eval_white = [
             [0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0],
             [0.5,  1.0,  1.0,  1.0,  1.0,  1.0,  1.0,  0.5],
@@ -58,8 +131,6 @@ class ChessAI:
             [0.0,   0.0, 0.0,  0.5,  0.5,  0.0,  0.0,  0.0]
         ]
         
-        self.rook_eval_black = self._reverse_array(self.rook_eval_white)
-        
         self.queen_eval_white = [
             [-2.0, -1.0, -1.0, -0.5, -0.5, -1.0, -1.0, -2.0],
             [-1.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0, -1.0],
@@ -71,8 +142,6 @@ class ChessAI:
             [-2.0, -1.0, -1.0, -0.5, -0.5, -1.0, -1.0, -2.0]
         ]
         
-        self.queen_eval_black = self._reverse_array(self.queen_eval_white)
-        
         self.king_eval_white = [
             [-3.0, -4.0, -4.0, -5.0, -5.0, -4.0, -4.0, -3.0],
             [-3.0, -4.0, -4.0, -5.0, -5.0, -4.0, -4.0, -3.0],
@@ -84,11 +153,108 @@ class ChessAI:
             [2.0,  3.0,  1.0,  0.0,  0.0,  1.0,  3.0,  2.0]
         ]
         
-        self.king_eval_black = self._reverse_array(self.king_eval_white)
+        # Endgame Piece-Square Tables, blended with the tables above by game phase
+        self.pawn_eval_endgame_white = [
+            [0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0],
+            [8.0,  8.0,  8.0,  8.0,  8.0,  8.0,  8.0,  8.0],
+            [5.0,  5.0,  5.0,  5.0,  5.0,  5.0,  5.0,  5.0],
+            [3.0,  3.0,  3.0,  3.0,  3.0,  3.0,  3.0,  3.0],
+            [1.5,  1.5,  1.5,  1.5,  1.5,  1.5,  1.5,  1.5],
+            [0.5,  0.5,  0.5,  0.5,  0.5,  0.5,  0.5,  0.5],
+            [0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0],
+            [0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0]
+        ]
+
+        self.knight_eval_endgame_white = [
+            [-5.0, -4.0, -3.0, -3.0, -3.0, -3.0, -4.0, -5.0],
+            [-4.0, -2.0, -0.5,  0.0,  0.0, -0.5, -2.0, -4.0],
+            [-3.0, -0.5,  1.0,  1.5,  1.5,  1.0, -0.5, -3.0],
+            [-3.0,  0.0,  1.5,  2.0,  2.0,  1.5,  0.0, -3.0],
+            [-3.0,  0.0,  1.5,  2.0,  2.0,  1.5,  0.0, -3.0],
+            [-3.0, -0.5,  1.0,  1.5,  1.5,  1.0, -0.5, -3.0],
+            [-4.0, -2.0, -0.5,  0.0,  0.0, -0.5, -2.0, -4.0],
+            [-5.0, -4.0, -3.0, -3.0, -3.0, -3.0, -4.0, -5.0]
+        ]
+
+        self.bishop_eval_endgame_white = [
+            [-2.0, -1.0, -1.0, -1.0, -1.0, -1.0, -1.0, -2.0],
+            [-1.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0, -1.0],
+            [-1.0,  0.0,  0.5,  1.0,  1.0,  0.5,  0.0, -1.0],
+            [-1.0,  0.0,  1.0,  1.5,  1.5,  1.0,  0.0, -1.0],
+            [-1.0,  0.0,  1.0,  1.5,  1.5,  1.0,  0.0, -1.0],
+            [-1.0,  0.0,  0.5,  1.0,  1.0,  0.5,  0.0, -1.0],
+            [-1.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0, -1.0],
+            [-2.0, -1.0, -1.0, -1.0, -1.0, -1.0, -1.0, -2.0]
+        ]
 
-    def _reverse_array(self, array):
-        """Reverse the evaluation matrix for black pieces."""
-        return array[::-1]
+        self.rook_eval_endgame_white = [
+            [0.5,  0.5,  0.5,  0.5,  0.5,  0.5,  0.5,  0.5],
+            [1.0,  1.0,  1.0,  1.0,  1.0,  1.0,  1.0,  1.0],
+            [0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0],
+            [0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0],
+            [0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0],
+            [0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0],
+            [0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0],
+            [0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0]
+        ]
+
+        self.queen_eval_endgame_white = [
+            [-1.0, -0.5, -0.5, -0.5, -0.5, -0.5, -0.5, -1.0],
+            [-0.5,  0.0,  0.5,  0.5,  0.5,  0.5,  0.0, -0.5],
+            [-0.5,  0.5,  1.0,  1.0,  1.0,  1.0,  0.5, -0.5],
+            [-0.5,  0.5,  1.0,  1.5,  1.5,  1.0,  0.5, -0.5],
+            [-0.5,  0.5,  1.0,  1.5,  1.5,  1.0,  0.5, -0.5],
+            [-0.5,  0.5,  1.0,  1.0,  1.0,  1.0,  0.5, -0.5],
+            [-0.5,  0.0,  0.5,  0.5,  0.5,  0.5,  0.0, -0.5],
+            [-1.0, -0.5, -0.5, -0.5, -0.5, -0.5, -0.5, -1.0]
+        ]
+
+        self.king_eval_endgame_white = [
+            [-5.0, -4.0, -3.0, -2.0, -2.0, -3.0, -4.0, -5.0],
+            [-3.0, -2.0, -1.0,  0.0,  0.0, -1.0, -2.0, -3.0],
+            [-3.0, -1.0,  2.0,  3.0,  3.0,  2.0, -1.0, -3.0],
+            [-3.0, -1.0,  3.0,  4.0,  4.0,  3.0, -1.0, -3.0],
+            [-3.0, -1.0,  3.0,  4.0,  4.0,  3.0, -1.0, -3.0],
+            [-3.0, -1.0,  2.0,  3.0,  3.0,  2.0, -1.0, -3.0],
+            [-3.0, -3.0,  0.0,  0.0,  0.0,  0.0, -3.0, -3.0],
+            [-5.0, -3.0, -3.0, -3.0, -3.0, -3.0, -3.0, -5.0]
+        ]
+
+        # Game phase: 24 with all minor/major pieces on the board, 0 with only kings and pawns
+        self.phase_weights = {
+            chess.PAWN: 0,
+            chess.KNIGHT: 1,
+            chess.BISHOP: 1,
+            chess.ROOK: 2,
+            chess.QUEEN: 4,
+            chess.KING: 0
+        }
+        self.max_phase = 24
+
+        self.tapered_eval = tapered_eval
+        self._build_square_tables()
+        self.exchange_values = {piece_type: self._get_piece_value(piece_type) for piece_type in chess.PIECE_TYPES}
+
+        # Score of a draw is -contempt: a positive contempt makes the AI avoid draws
+        self.contempt = contempt
+
+        # Deterministic mode searches moves in a fixed order that does not depend on move generation
+        self.deterministic = deterministic
+        # Optional TraceRecorder that logs every decision made by choose_move
+        self.recorder = recorder
+        self.depth_reached = 0
+        self._node_limit = float('inf')
+        self._deadline = None
+        self._build_zobrist_tables()
+
+        # Incremental evaluation state used during search (white's point of view)
+        self._eval_mg = 0.0
+        self._eval_eg = 0.0
+        self._eval_phase = 0
+        self._eval_stack = []
+
+        # Position hashes of the game since the last irreversible move, then of the search path
+        self._hash_stack = []
 
     def _get_piece_value(self, piece):
         """Assign base value to different pieces."""
@@ -102,133 +268,436 @@ class ChessAI:
         }
         return values.get(piece, 0.0)
 
-    def _get_piece_square_value(self, piece, square, color):
-        """Get positional value for a piece based on its square."""
-        row, col = chess.square_rank(square), chess.square_file(square)
-        
-        # Adjust row/col based on color
-        if color == chess.BLACK:
-            row = 7 - row
-        
-        # Select appropriate evaluation matrix
-        if piece == chess.PAWN:
-            eval_matrix = self.pawn_eval_white if color == chess.WHITE else self.pawn_eval_black
-        elif piece == chess.KNIGHT:
-            eval_matrix = self.knight_eval_white if color == chess.WHITE else self.knight_eval_black
-        elif piece == chess.BISHOP:
-            eval_matrix = self.bishop_eval_white if color == chess.WHITE else self.bishop_eval_black
-        elif piece == chess.ROOK:
-            eval_matrix = self.rook_eval_white if color == chess.WHITE else self.rook_eval_black
-        elif piece == chess.QUEEN:
-            eval_matrix = self.queen_eval_white if color == chess.WHITE else self.queen_eval_black
-        elif piece == chess.KING:
-            eval_matrix = self.king_eval_white if color == chess.WHITE else self.king_eval_black
+    def _build_square_tables(self):
+        """Precompute per-square middlegame/endgame values (material included) for every piece.
+
+        The evaluation matrices are written from white's point of view with the
+        8th rank in the first row, so white reads them upside down and black
+        reads the mirrored matrix.
+        """
+        matrices = {
+            chess.PAWN: (self.pawn_eval_white, self.pawn_eval_endgame_white),
+            chess.KNIGHT: (self.knight_eval_white, self.knight_eval_endgame_white),
+            chess.BISHOP: (self.bishop_eval_white, self.bishop_eval_endgame_white),
+            chess.ROOK: (self.rook_eval_white, self.rook_eval_endgame_white),
+            chess.QUEEN: (self.queen_eval_white, self.queen_eval_endgame_white),
+            chess.KING: (self.king_eval_white, self.king_eval_endgame_white),
+        }
+
+        # Indexed as table[color][piece_type][square]
+        self.mg_table = {chess.WHITE: [None] * 7, chess.BLACK: [None] * 7}
+        self.eg_table = {chess.WHITE: [None] * 7, chess.BLACK: [None] * 7}
+
+        for piece_type, (mg_matrix, eg_matrix) in matrices.items():
+            value = self._get_piece_value(piece_type)
+            for color in chess.COLORS:
+                mg_squares = []
+                eg_squares = []
+                for square in chess.SQUARES:
+                    rank, file = chess.square_rank(square), chess.square_file(square)
+                    row = 7 - rank if color == chess.WHITE else rank
+                    mg_squares.append(value + mg_matrix[row][file])
+                    eg_squares.append(value + eg_matrix[row][file])
+                self.mg_table[color][piece_type] = mg_squares
+                self.eg_table[color][piece_type] = eg_squares
+
+    def _build_zobrist_tables(self):
+        """Split the polyglot random numbers into per-piece, castling, en passant and turn keys."""
+        keys = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+        self.zobrist_pieces = {chess.WHITE: [None] * 7, chess.BLACK: [None] * 7}
+        for piece_type in chess.PIECE_TYPES:
+            for color in chess.COLORS:
+                offset = 64 * (2 * (piece_type - 1) + (1 if color == chess.WHITE else 0))
+                self.zobrist_pieces[color][piece_type] = keys[offset:offset + 64]
+        self.zobrist_castling = {
+            chess.H1: keys[768],
+            chess.A1: keys[769],
+            chess.H8: keys[770],
+            chess.A8: keys[771]
+        }
+        self.zobrist_castling_mask = chess.BB_H1 | chess.BB_A1 | chess.BB_H8 | chess.BB_A8
+        self.zobrist_ep_file = keys[772:780]
+        self.zobrist_turn = keys[780]
+
+    def _compute_hash(self, board):
+        """Compute the position hash from scratch (kept incrementally by _push during search)."""
+        key = 0
+        for color in chess.COLORS:
+            occupied = board.occupied_co[color]
+            for piece_type in chess.PIECE_TYPES:
+                squares = self.zobrist_pieces[color][piece_type]
+                for square in chess.scan_forward(board.pieces_mask(piece_type, color) & occupied):
+                    key ^= squares[square]
+        for square in chess.scan_forward(board.castling_rights & self.zobrist_castling_mask):
+            key ^= self.zobrist_castling[square]
+        key ^= self._ep_key(board)
+        if board.turn == chess.WHITE:
+            key ^= self.zobrist_turn
+        return key
+
+    def _ep_key(self, board):
+        """Hash the en passant file only if a pawn can actually capture there."""
+        ep_square = board.ep_square
+        if ep_square is None:
+            return 0
+        capturers = board.pawns & board.occupied_co[board.turn] & chess.BB_PAWN_ATTACKS[not board.turn][ep_square]
+        return self.zobrist_ep_file[chess.square_file(ep_square)] if capturers else 0
+
+    def _compute_eval_state(self, board):
+        """Scan the board once and return (middlegame, endgame, phase) from white's point of view."""
+        mg = 0.0
+        eg = 0.0
+        phase = 0
+
+        for color in chess.COLORS:
+            sign = 1 if color == chess.WHITE else -1
+            mg_table = self.mg_table[color]
+            eg_table = self.eg_table[color]
+            occupied = board.occupied_co[color]
+            for piece_type in chess.PIECE_TYPES:
+                mask = board.pieces_mask(piece_type, color) & occupied
+                if not mask:
+                    continue
+                phase += self.phase_weights[piece_type] * chess.popcount(mask)
+                mg_squares = mg_table[piece_type]
+                eg_squares = eg_table[piece_type]
+                for square in chess.scan_forward(mask):
+                    mg += sign * mg_squares[square]
+                    eg += sign * eg_squares[square]
+
+        return mg, eg, phase
+
+    def _blend(self, mg, eg, phase):
+        """Blend middlegame and endgame scores by game phase, from the AI's point of view."""
+        if self.tapered_eval:
+            phase = min(phase, self.max_phase)
+            score = (mg * phase + eg * (self.max_phase - phase)) / self.max_phase
         else:
-            return 0.0
-        
-        return eval_matrix[row][col]
+            score = mg
+        return score if self.color == chess.WHITE else -score
 
-    def evaluate_board(self, board):
-        """Evaluate the current board state."""
+    def _draw_score(self):
+        """Score of a drawn position from the AI's point of view."""
+        return -self.contempt
+
+    def _terminal_score(self, board):
+        """Return the score of a finished game, or None if the game goes on."""
         if board.is_checkmate():
             return float('-inf') if board.turn == self.color else float('inf')
-        
+
         if board.is_stalemate() or board.is_insufficient_material():
-            return 0.0
-        
-        total_evaluation = 0.0
-        
-        for square in chess.SQUARES:
-            piece = board.piece_at(square)
-            if piece is not None:
-                # Determine sign based on piece color
-                sign = 1 if piece.color == self.color else -1
-                
-                # Calculate piece value
-                piece_value = self._get_piece_value(piece.piece_type)
-                piece_square_value = self._get_piece_square_value(piece.piece_type, square, piece.color)
-                
-                total_evaluation += sign * (piece_value + piece_square_value)
-        
-        return total_evaluation
+            return self._draw_score()
+
+        return None
+
+    def evaluate_board(self, board):
+        """Evaluate the current board state."""
+        terminal = self._terminal_score(board)
+        if terminal is not None:
+            return terminal
+
+        mg, eg, phase = self._compute_eval_state(board)
+        return self._blend(mg, eg, phase)
+
+    def _init_search(self, board):
+        """Reset the incremental evaluation state and position history to match the root position."""
+        self._init_eval_state(board)
+        self._init_history(board)
+
+    def _init_eval_state(self, board):
+        """Reset the incremental evaluation state to match the root position."""
+        self._eval_mg, self._eval_eg, self._eval_phase = self._compute_eval_state(board)
+        self._eval_stack = []
+
+    def _init_history(self, board):
+        """Hash the root position and the game positions before it that can still repeat."""
+        # Only positions since the last capture or pawn move can repeat
+        history = []
+        previous = board.copy()
+        for _ in range(min(board.halfmove_clock, len(board.move_stack))):
+            previous.pop()
+            history.append(self._compute_hash(previous))
+        history.reverse()
+        history.append(self._compute_hash(board))
+        self._hash_stack = history
+
+    def _push(self, board, move):
+        """Make a move on the board and update the incremental evaluation state and hash."""
+        self._eval_stack.append((self._eval_mg, self._eval_eg, self._eval_phase))
+
+        color = board.turn
+        sign = 1 if color == chess.WHITE else -1
+        mg_table = self.mg_table[color]
+        eg_table = self.eg_table[color]
+        zobrist = self.zobrist_pieces[color]
+        piece_type = board.piece_type_at(move.from_square)
+        placed_type = move.promotion or piece_type
+
+        mg = mg_table[placed_type][move.to_square] - mg_table[piece_type][move.from_square]
+        eg = eg_table[placed_type][move.to_square] - eg_table[piece_type][move.from_square]
+        key = self._hash_stack[-1] ^ self.zobrist_turn
+        key ^= zobrist[placed_type][move.to_square] ^ zobrist[piece_type][move.from_square]
+        if move.promotion:
+            self._eval_phase += self.phase_weights[move.promotion]
+
+        if board.is_castling(move):
+            rank = chess.square_rank(move.from_square)
+            if board.is_kingside_castling(move):
+                rook_from, rook_to = chess.square(7, rank), chess.square(5, rank)
+            else:
+                rook_from, rook_to = chess.square(0, rank), chess.square(3, rank)
+            rook_mg = mg_table[chess.ROOK]
+            rook_eg = eg_table[chess.ROOK]
+            mg += rook_mg[rook_to] - rook_mg[rook_from]
+            eg += rook_eg[rook_to] - rook_eg[rook_from]
+            key ^= zobrist[chess.ROOK][rook_to] ^ zobrist[chess.ROOK][rook_from]
+        else:
+            if board.is_en_passant(move):
+                captured_square = move.to_square - 8 * sign
+                captured_type = chess.PAWN
+            else:
+                captured_square = move.to_square
+                captured_type = board.piece_type_at(captured_square)
+            if captured_type:
+                mg += self.mg_table[not color][captured_type][captured_square]
+                eg += self.eg_table[not color][captured_type][captured_square]
+                key ^= self.zobrist_pieces[not color][captured_type][captured_square]
+                self._eval_phase -= self.phase_weights[captured_type]
+
+        self._eval_mg += sign * mg
+        self._eval_eg += sign * eg
+
+        castling_rights = board.castling_rights
+        if board.ep_square is not None:
+            key ^= self._ep_key(board)
+        board.push(move)
+
+        changed_rights = (castling_rights ^ board.castling_rights) & self.zobrist_castling_mask
+        if changed_rights:
+            for square in chess.scan_forward(changed_rights):
+                key ^= self.zobrist_castling[square]
+        if board.ep_square is not None:
+            key ^= self._ep_key(board)
+        self._hash_stack.append(key)
+
+    def _pop(self, board):
+        """Take back the last move and restore the incremental evaluation state and hash."""
+        self._eval_mg, self._eval_eg, self._eval_phase = self._eval_stack.pop()
+        self._hash_stack.pop()
+        return board.pop()
+
+    def _is_repetition(self, board):
+        """Check whether the position already occurred in the game or on the search path."""
+        # Same side to move and no irreversible move in between: 4, 6, 8, ... plies back
+        limit = min(board.halfmove_clock, len(self._hash_stack) - 1)
+        if limit < 4:
+            return False
+        hashes = self._hash_stack
+        key = hashes[-1]
+        for plies_back in range(4, limit + 1, 2):
+            if hashes[-1 - plies_back] == key:
+                return True
+        return False
+
+    def _is_draw(self, board):
+        """Cheap draw detection for search nodes: 50-move rule and repetition.
+
+        Insufficient material and stalemate are left to _terminal_score, which
+        checks them at the leaves and at nodes without legal moves.
+        """
+        if board.halfmove_clock >= 100 and not board.is_checkmate():
+            return True
+        return self._is_repetition(board)
+
+    def _evaluate_node(self, board):
+        """Evaluate a search leaf using the incrementally maintained state.
+
+        Unlike evaluate_board, checkmate is only looked for in check, and
+        stalemate is found by asking for a single legal move instead of
+        running the full game-over checks.
+        """
+        if board.is_check():
+            if board.is_checkmate():
+                return float('-inf') if board.turn == self.color else float('inf')
+        elif not any(board.generate_legal_moves()):
+            return self._draw_score()
+
+        if not (board.pawns | board.rooks | board.queens) and board.is_insufficient_material():
+            return self._draw_score()
+
+        return self._blend(self._eval_mg, self._eval_eg, self._eval_phase)
+
+    def _ordered_moves(self, board):
+        """Return the legal moves in the order they are searched."""
+        if self.deterministic:
+            return sorted(board.legal_moves, key=lambda move: (move.from_square, move.to_square, move.promotion or 0))
+        return board.legal_moves
+
+    def _order_by_exchange(self, board):
+        """Return (move, exchange gain) pairs: winning and even captures first, then quiet moves, then losing captures.
+
+        The gain is None for moves that capture nothing.
+        """
+        captures = []
+        quiet = []
+        for move in self._ordered_moves(board):
+            if board.is_capture(move):
+                captures.append((move, static_exchange(board, move, self.exchange_values)))
+            else:
+                quiet.append((move, None))
+        captures.sort(key=lambda item: item[1], reverse=True)
+        split = 0
+        while split < len(captures) and captures[split][1] >= 0:
+            split += 1
+        return captures[:split] + quiet + captures[split:]
 
     def minimax(self, board, depth, maximizing_player):
-        """Minimax algorithm."""
+        """Minimax algorithm.
+
+        Deliberately searches every legal move without exchange ordering or
+        pruning: it is the full-width reference that Alpha-Beta is compared with.
+        """
+        self._init_search(board)
+        return self._minimax(board, depth, maximizing_player)
+
+    def _minimax(self, board, depth, maximizing_player):
+        """Recursive part of minimax, working on the incremental state of the root position."""
         self.calculations += 1
+        if self.calculations > self._node_limit:
+            raise SearchAborted()
+        # The clock is only read every 256 nodes
+        if self._deadline is not None and not self.calculations & 255 and time.perf_counter() > self._deadline:
+            raise SearchAborted()
+
+        if self._is_draw(board):
+            return self._draw_score()
+        if depth == 0:
+            return self._evaluate_node(board)
 
-        if depth == 0 or board.is_game_over():
-            return self.evaluate_board(board)       
+        has_moves = False
         if maximizing_player:
             max_eval = float('-inf')
-            for move in board.legal_moves:
-                board.push(move)
-                eval = self.minimax(board, depth - 1, False)
-                board.pop()
+            for move in self._ordered_moves(board):
+                has_moves = True
+                self._push(board, move)
+                eval = self._minimax(board, depth - 1, False)
+                self._pop(board)
                 max_eval = max(max_eval, eval)
-            return max_eval
+            return max_eval if has_moves else self._terminal_score(board)
         else:
             min_eval = float('inf')
-            for move in board.legal_moves:
-                board.push(move)
-                eval = self.minimax(board, depth - 1, True)
-                board.pop()
+            for move in self._ordered_moves(board):
+                has_moves = True
+                self._push(board, move)
+                eval = self._minimax(board, depth - 1, True)
+                self._pop(board)
                 min_eval = min(min_eval, eval)
-            return min_eval
+            return min_eval if has_moves else self._terminal_score(board)
     
-    def minimax_alpha_beta(self, board, depth, alpha, beta, maximizing_player):
-        """Minimax algorithm with alpha-beta pruning."""
+    def minimax_alpha_beta(self, board, depth, alpha, beta, maximizing_player, pv=None):
+        """Minimax algorithm with alpha-beta pruning.
+
+        If a list is passed as pv, it is filled with the best line found from this node.
+        """
+        self._init_search(board)
+        return self._minimax_alpha_beta(board, depth, alpha, beta, maximizing_player, pv)
+
+    def _minimax_alpha_beta(self, board, depth, alpha, beta, maximizing_player, pv=None):
+        """Recursive part of minimax_alpha_beta, working on the incremental state of the root position."""
         self.calculations_alpha_beta += 1  # Count every node evaluated
+        if self.calculations_alpha_beta > self._node_limit:
+            raise SearchAborted()
+        # The clock is only read every 256 nodes
+        if self._deadline is not None and not self.calculations_alpha_beta & 255 and time.perf_counter() > self._deadline:
+            raise SearchAborted()
 
-        if depth == 0 or board.is_game_over():
-            return self.evaluate_board(board)
+        # Repetitions and the 50-move rule are scored as draws without a full game-over check
+        if self._is_draw(board):
+            return self._draw_score()
+        if depth == 0:
+            return self._evaluate_node(board)
 
+        has_moves = False
+        pruned = False
+        child_pv = None
+        moves = self._order_by_exchange(board)
         if maximizing_player:
             max_eval = float('-inf')
-            for move in board.legal_moves:
-                board.push(move)
-                eval = self.minimax_alpha_beta(board, depth - 1, alpha, beta, False)
-                board.pop()
+            for move, gain in moves:
+                if depth == 1 and gain is not None and gain < 0 and not board.gives_check(move):
+                    pruned = True
+                    continue  # Losing capture at the frontier: the leaf would not see the recapture
+                if pv is not None:
+                    child_pv = []
+                self._push(board, move)
+                eval = self._minimax_alpha_beta(board, depth - 1, alpha, beta, False, child_pv)
+                self._pop(board)
+                if pv is not None and (not has_moves or eval > max_eval):
+                    pv[:] = [move] + child_pv
+                has_moves = True
                 max_eval = max(max_eval, eval)
                 alpha = max(alpha, eval)
                 if beta <= alpha:
                     break  # Beta cut-off
-            return max_eval
+            if has_moves:
+                return max_eval
+            # Only losing captures were left, otherwise no legal moves: checkmate or stalemate
+            return self._evaluate_node(board) if pruned else self._terminal_score(board)
         else:
             min_eval = float('inf')
-            for move in board.legal_moves:
-                board.push(move)
-                eval = self.minimax_alpha_beta(board, depth - 1, alpha, beta, True)
-                board.pop()
+            for move, gain in moves:
+                if depth == 1 and gain is not None and gain < 0 and not board.gives_check(move):
+                    pruned = True
+                    continue  # Losing capture at the frontier: the leaf would not see the recapture
+                if pv is not None:
+                    child_pv = []
+                self._push(board, move)
+                eval = self._minimax_alpha_beta(board, depth - 1, alpha, beta, True, child_pv)
+                self._pop(board)
+                if pv is not None and (not has_moves or eval < min_eval):
+                    pv[:] = [move] + child_pv
+                has_moves = True
                 min_eval = min(min_eval, eval)
                 beta = min(beta, eval)
                 if beta <= alpha:
                     break  # Alpha cut-off
-            return min_eval
+            if has_moves:
+                return min_eval
+            # Only losing captures were left, otherwise no legal moves: checkmate or stalemate
+            return self._evaluate_node(board) if pruned else self._terminal_score(board)
 
-    def get_best_move(self, board, depth=3, use_alpha_beta=True):
-        """Find the best move using minimax with or without alpha-beta pruning."""
+    def search(self, board, depth=3, use_alpha_beta=True, search_moves=None):
+        """Search the position and return the best move with its score from the AI's point of view.
+
+        search_moves optionally restricts the root moves that are considered.
+        Returns (None, -inf) when no root move is left to search.
+        """
         best_move = None
         max_eval = float('-inf')
         alpha = float('-inf')
         beta = float('inf')
         self.calculations = 0
         self.calculations_alpha_beta = 0
+        self._init_search(board)
 
-        # Evaluate all legal moves
-        for move in board.legal_moves:
-            board.push(move)
+        # Evaluate all legal moves, good captures first when pruning
+        root_moves = self._order_by_exchange(board) if use_alpha_beta else [(move, None) for move in self._ordered_moves(board)]
+        for move, _ in root_moves:
+            if search_moves is not None and move not in search_moves:
+                continue
+            self._push(board, move)
             # Check for immediate checkmate
             if board.is_checkmate():
-                board.pop()
-                return move, self.calculations, self.calculations_alpha_beta
+                self._pop(board)
+                return move, float('inf')
 
             # Evaluate the move using the selected algorithm
             if use_alpha_beta:
-                move_eval = self.minimax_alpha_beta(board, depth - 1, alpha, beta, False)
+                move_eval = self._minimax_alpha_beta(board, depth - 1, alpha, beta, False)
             else:
-                move_eval = self.minimax(board, depth - 1, False)
+                move_eval = self._minimax(board, depth - 1, False)
             
-            board.pop()
+            self._pop(board)
 
             # Update best move
             if best_move is None or move_eval > max_eval:
@@ -238,10 +707,141 @@ class ChessAI:
             if use_alpha_beta:
                 alpha = max(alpha, move_eval)
 
-        # Return best move or first legal move if none found, along with calculation statistics
-        return best_move if best_move else next(board.legal_moves, None), self.calculations, self.calculations_alpha_beta
+        # Every searched move sets best_move, so it is only None without any root move to search
+        return best_move, max_eval
+
+    def get_best_move(self, board, depth=3, use_alpha_beta=True):
+        """Find the best move using minimax with or without alpha-beta pruning."""
+        best_move, _ = self.search(board, depth=depth, use_alpha_beta=use_alpha_beta)
+        # Return best move along with calculation statistics
+        return best_move, self.calculations, self.calculations_alpha_beta
+
+    def analyze(self, board, depth=3, multipv=3, search_moves=None):
+        """Rank the best root moves, yielding a list of AnalysisLine after every depth.
+
+        All lines of one iteration share a single alpha-beta pass: each root move
+        only has to beat the current multipv-th best score, and the root moves are
+        ordered by the scores of the previous iteration. The AI must be the side
+        to move; scores are from its point of view.
+        """
+        if multipv < 1:
+            raise ValueError("multipv must be at least 1")
+
+        self.calculations_alpha_beta = 0
+        self._init_search(board)
+
+        root_moves = [move for move in self._ordered_moves(board) if search_moves is None or move in search_moves]
+        if not root_moves:
+            return
+
+        for current_depth in range(1, depth + 1):
+            lines = []
+            scores = {}
+            for move in root_moves:
+                # Moves that cannot beat the multipv-th best line only need an upper bound
+                alpha = lines[multipv - 1].score if len(lines) >= multipv else float('-inf')
+                pv = []
+                self._push(board, move)
+                score = self._minimax_alpha_beta(board, current_depth - 1, alpha, float('inf'), False, pv)
+                self._pop(board)
+                scores[move] = score
+
+                if len(lines) < multipv or score > alpha:
+                    lines.append(AnalysisLine(move, score, [move] + pv, current_depth))
+                    lines.sort(key=lambda line: line.score, reverse=True)
+                    del lines[multipv:]
+
+            # Search the most promising moves first in the next iteration
+            root_moves.sort(key=lambda move: scores[move], reverse=True)
+            yield lines
+
+    def get_top_moves(self, board, depth=3, multipv=3, search_moves=None):
+        """Return the ranked lines of the deepest iteration of analyze()."""
+        lines = []
+        for lines in self.analyze(board, depth=depth, multipv=multipv, search_moves=search_moves):
+            pass
+        return lines
+
+    def search_node_limited(self, board, max_nodes, max_depth=3, use_alpha_beta=True):
+        """Deepen iteratively until max_depth or until max_nodes nodes are searched.
+
+        The result of the deepest completed iteration is returned, so for a given
+        position and node budget the move does not depend on the machine's speed.
+        """
+        return self._search_limited(board, max_depth, use_alpha_beta, max_nodes=max_nodes)
+
+    def search_time_limited(self, board, max_time, max_depth=64, use_alpha_beta=True):
+        """Deepen iteratively until max_depth or until max_time seconds have passed.
+
+        The iteration running at the deadline is aborted and the result of the
+        deepest completed iteration is returned.
+        """
+        return self._search_limited(board, max_depth, use_alpha_beta, max_time=max_time)
+
+    def _search_limited(self, board, max_depth, use_alpha_beta, max_nodes=None, max_time=None):
+        """Iterative deepening that stops when the node budget or the time budget is spent."""
+        best_move = None
+        best_eval = float('-inf')
+        total_calculations = 0
+        total_calculations_alpha_beta = 0
+        root_length = len(board.move_stack)
+        self.depth_reached = 0
+        if max_time is not None:
+            self._deadline = time.perf_counter() + max_time
+
+        try:
+            for depth in range(1, max_depth + 1):
+                if max_nodes is not None:
+                    self._node_limit = max_nodes - total_calculations - total_calculations_alpha_beta
+                try:
+                    move, move_eval = self.search(board, depth=depth, use_alpha_beta=use_alpha_beta)
+                except SearchAborted:
+                    # Take back the moves of the interrupted search
+                    while len(board.move_stack) > root_length:
+                        self._pop(board)
+                    break
+                finally:
+                    total_calculations += self.calculations
+                    total_calculations_alpha_beta += self.calculations_alpha_beta
+                best_move, best_eval = move, move_eval
+                self.depth_reached = depth
+                # A forced mate will not change at a greater depth
+                if best_eval in (float('inf'), float('-inf')):
+                    break
+        finally:
+            self._node_limit = float('inf')
+            self._deadline = None
+
+        self.calculations = total_calculations
+        self.calculations_alpha_beta = total_calculations_alpha_beta
+        if best_move is None:
+            best_move = next(iter(self._ordered_moves(board)), None)
+        return best_move, best_eval
+
+    def choose_move(self, board, use_alpha_beta=True, depth=3, max_nodes=None):
+        """Choose a move for the AI.
+
+        With max_nodes the search is node-limited (depth is then the maximum depth).
+        """
+        start = time.perf_counter()
+        if max_nodes is None:
+            move, calculations, calculations_alpha_beta = self.get_best_move(board, depth=depth, use_alpha_beta=use_alpha_beta)
+            self.depth_reached = depth
+        else:
+            move, _ = self.search_node_limited(board, max_nodes, max_depth=depth, use_alpha_beta=use_alpha_beta)
+            calculations, calculations_alpha_beta = self.calculations, self.calculations_alpha_beta
+        elapsed = time.perf_counter() - start
+
+        if self.recorder is not None:
+            settings = {
+                'depth': depth,
+                'max_nodes': max_nodes,
+                'use_alpha_beta': use_alpha_beta,
+                'tapered_eval': self.tapered_eval,
+                'contempt': self.contempt,
+                'deterministic': self.deterministic
+            }
+            nodes = calculations_alpha_beta if use_alpha_beta else calculations
+            self.recorder.record(board, self.color, move, nodes, elapsed, self.depth_reached, settings)
 
-    def choose_move(self, board, use_alpha_beta=True, depth=3):
-        """Choose a move for the AI."""
-        move, calculations, calculations_alpha_beta = self.get_best_move(board, depth=depth, use_alpha_beta=use_alpha_beta)
         return move, calculations, calculations_alpha_beta
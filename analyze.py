@@ -0,0 +1,235 @@
+import argparse
+import collections
+import io
+import json
+import math
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+import chess
+import chess.pgn
+
+from ai import ChessAI
+
+
+# Per-process engines, one for each side so scores can be searched from the side to move
+_engines = None
+_options = None
+
+
+def iter_game_texts(handle, offset=0):
+    """Yield (pgn_text, end_offset) for every game of a binary PGN file, one game at a time.
+
+    Games are split on the first header line that follows movetext, so only
+    the current game is ever held in memory.
+    """
+    handle.seek(offset)
+    lines = []
+    in_movetext = False
+    in_comment = False
+    position = offset
+
+    for line in handle:
+        stripped = line.strip()
+        is_header = stripped.startswith(b"[") and not in_comment
+        if is_header and in_movetext:
+            yield b"".join(lines).decode("utf-8", errors="replace"), position
+            lines = []
+            in_movetext = False
+        if stripped and not is_header:
+            in_movetext = True
+            if b"{" in line or b"}" in line:
+                in_comment = line.rfind(b"{") > line.rfind(b"}")
+        lines.append(line)
+        position += len(line)
+
+    if any(line.strip() for line in lines):
+        yield b"".join(lines).decode("utf-8", errors="replace"), position
+
+
+def _init_worker(options, ignore_interrupt=False):
+    global _engines, _options
+    if ignore_interrupt:
+        # Ctrl-C is handled by the main process, which terminates the pool
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _engines = {chess.WHITE: ChessAI(chess.WHITE), chess.BLACK: ChessAI(chess.BLACK)}
+    _options = options
+
+
+def _score_position(board):
+    """Return (score from white's point of view, best move or None, depth reached)."""
+    white = _engines[chess.WHITE]
+    if board.is_game_over() or (_options["depth"] == 0 and _options["movetime"] is None):
+        return white.evaluate_board(board), None, 0
+
+    engine = _engines[board.turn]
+    sign = 1 if board.turn == chess.WHITE else -1
+
+    if _options["movetime"] is None:
+        move, score = engine.search(board, depth=_options["depth"])
+        return sign * score, move, _options["depth"]
+
+    # Iterative deepening; the search running at the deadline is aborted
+    move, score = engine.search_time_limited(board, _options["movetime"], max_depth=_options["max_depth"])
+    if engine.depth_reached == 0:
+        return white.evaluate_board(board), None, 0
+    return sign * score, move, engine.depth_reached
+
+
+def _format_score(score):
+    if math.isinf(score):
+        return "#+" if score > 0 else "#-"
+    return f"{score:+.2f}"
+
+
+def analyze_game(game_text, index):
+    """Analyze one game and return its output (annotated PGN or JSONL lines) as text."""
+    game = chess.pgn.read_game(io.StringIO(game_text))
+    if game is None:
+        return ""
+
+    every = _options["every"]
+    board = game.board()
+    records = []
+
+    def visit(node, ply, san):
+        if ply % every != 0:
+            return
+        score, best, depth = _score_position(board)
+        if _options["format"] == "pgn":
+            comment = f"eval {_format_score(score)}"
+            if best is not None:
+                comment += f" best {board.san(best)} depth {depth}"
+            node.comment = f"{node.comment} {comment}".strip()
+        else:
+            record = {
+                "game": index,
+                "ply": ply,
+                "move": san,
+                "fen": board.fen(),
+                "score": None if math.isinf(score) else round(score, 2),
+            }
+            if math.isinf(score):
+                record["mate"] = "white" if score > 0 else "black"
+            if best is not None:
+                record["best"] = best.uci()
+                record["depth"] = depth
+            records.append(json.dumps(record))
+
+    visit(game, 0, None)
+    for ply, node in enumerate(game.mainline(), start=1):
+        san = node.san()
+        board.push(node.move)
+        visit(node, ply, san)
+
+    if _options["format"] == "pgn":
+        exporter = chess.pgn.StringExporter(headers=True, variations=True, comments=True)
+        return game.accept(exporter) + "\n\n"
+    return "".join(record + "\n" for record in records)
+
+
+def load_checkpoint(path):
+    if path is None or not os.path.exists(path):
+        return {"input_offset": 0, "output_offset": 0, "games": 0}
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def save_checkpoint(path, checkpoint):
+    if path is None:
+        return
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as handle:
+        json.dump(checkpoint, handle)
+    os.replace(tmp_path, path)
+
+
+def run(args):
+    options = {
+        "depth": args.depth,
+        "movetime": args.movetime,
+        "max_depth": args.max_depth,
+        "every": args.every,
+        "format": args.format,
+    }
+    checkpoint_path = args.checkpoint if args.checkpoint else args.output + ".checkpoint"
+    checkpoint = load_checkpoint(checkpoint_path) if args.resume else {"input_offset": 0, "output_offset": 0, "games": 0}
+
+    pool = None
+    if args.processes > 1:
+        pool = multiprocessing.Pool(args.processes, initializer=_init_worker, initargs=(options, True))
+    else:
+        _init_worker(options)
+
+    # Results are written in input order; at most max_pending games are in flight at once
+    max_pending = max(1, args.processes) * 4
+    pending = collections.deque()
+    start = time.time()
+
+    with open(args.input, "rb") as source, open(args.output, "r+b" if args.resume and os.path.exists(args.output) else "wb") as sink:
+        sink.truncate(checkpoint["output_offset"])
+        sink.seek(checkpoint["output_offset"])
+
+        def write_oldest():
+            result, end_offset = pending.popleft()
+            text = result.get() if pool is not None else result
+            sink.write(text.encode("utf-8"))
+            checkpoint["input_offset"] = end_offset
+            checkpoint["games"] += 1
+            if checkpoint["games"] % args.checkpoint_every == 0:
+                sink.flush()
+                checkpoint["output_offset"] = sink.tell()
+                save_checkpoint(checkpoint_path, checkpoint)
+                print(f"{checkpoint['games']} games analyzed ({time.time() - start:.1f}s)", file=sys.stderr)
+
+        try:
+            for game_text, end_offset in iter_game_texts(source, checkpoint["input_offset"]):
+                index = checkpoint["games"] + len(pending)
+                if args.limit is not None and index >= args.limit:
+                    break
+                if pool is not None:
+                    pending.append((pool.apply_async(analyze_game, (game_text, index)), end_offset))
+                else:
+                    pending.append((analyze_game(game_text, index), end_offset))
+                if len(pending) >= max_pending:
+                    write_oldest()
+            while pending:
+                write_oldest()
+        finally:
+            # Everything written so far is consistent with input_offset, so it is safe to resume from here
+            if pool is not None:
+                pool.terminate()
+            sink.flush()
+            checkpoint["output_offset"] = sink.tell()
+            save_checkpoint(checkpoint_path, checkpoint)
+
+    print(f"{checkpoint['games']} games analyzed ({time.time() - start:.1f}s)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze the games of a PGN file with ChessAI")
+    parser.add_argument("input", help="PGN file to analyze")
+    parser.add_argument("output", help="annotated PGN or JSONL output file")
+    parser.add_argument("--format", choices=["pgn", "jsonl"], default="jsonl", help="output format")
+    parser.add_argument("--depth", type=int, default=0, help="search depth (0: static evaluation only)")
+    parser.add_argument("--movetime", type=float, default=None, help="seconds per position, searched with iterative deepening")
+    parser.add_argument("--max-depth", type=int, default=6, help="depth limit for --movetime")
+    parser.add_argument("--every", type=int, default=1, help="analyze every N-th ply")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many games")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file (default: OUTPUT.checkpoint)")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="save a checkpoint every N games")
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint of an interrupted run")
+    args = parser.parse_args()
+    try:
+        run(args)
+    except KeyboardInterrupt:
+        print("Interrupted, rerun with --resume to continue from the last checkpoint", file=sys.stderr)
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
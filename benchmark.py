@@ -0,0 +1,178 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import chess
+
+from ai import ChessAI
+
+
+# Endgames the attacking side (to move) wins with correct king play
+ENDGAME_POSITIONS = [
+    ("KQ vs K", "8/8/8/8/k7/8/2K5/7Q w - - 0 1"),
+    ("KRR vs K", "8/8/8/4k3/8/8/8/R3K2R w - - 0 1"),
+    ("KP vs K", "8/8/1k6/8/8/8/6P1/6K1 w - - 0 1"),
+]
+
+
+def play_out(fen, tapered_eval, depth=3, defender_depth=2, max_plies=120):
+    """Play an endgame to the end and count the attacker's search nodes.
+
+    The attacking side uses the evaluation under test, the defending side
+    always uses the default (tapered) evaluation.
+    """
+    board = chess.Board(fen)
+    attacker = ChessAI(board.turn, tapered_eval=tapered_eval)
+    defender = ChessAI(not board.turn)
+    nodes = 0
+
+    while not board.is_game_over(claim_draw=True) and len(board.move_stack) < max_plies:
+        if board.turn == attacker.color:
+            move, _, calculations_alpha_beta = attacker.get_best_move(board, depth=depth)
+            nodes += calculations_alpha_beta
+        else:
+            move, _, _ = defender.get_best_move(board, depth=defender_depth)
+        board.push(move)
+
+    result = board.result(claim_draw=True)
+    return result, len(board.move_stack), nodes
+
+
+def run_endgames(depth):
+    print(f"Endgame play-out at depth {depth} (nodes searched by the winning side)")
+    print(f"{'position':<10} {'evaluation':<12} {'result':<8} {'plies':>6} {'nodes':>9} {'time':>8}")
+    for name, fen in ENDGAME_POSITIONS:
+        for tapered_eval in (True, False):
+            start = time.time()
+            result, plies, nodes = play_out(fen, tapered_eval, depth=depth)
+            elapsed = time.time() - start
+            label = "tapered" if tapered_eval else "middlegame"
+            print(f"{name:<10} {label:<12} {result:<8} {plies:>6} {nodes:>9} {elapsed:>7.2f}s")
+
+
+# Runs in a fresh interpreter so module caches do not hide the cold-start cost
+STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import chess
+from ai import ChessAI
+from board import Board
+imported = time.perf_counter()
+board = Board()
+ai = ChessAI(board.turn())
+created = time.perf_counter()
+move, _, nodes = ai.get_best_move(board.board, depth={depth})
+moved = time.perf_counter()
+print(imported - start, created - imported, moved - created, nodes, int('pygame' in sys.modules))
+"""
+
+
+# GUI start with dummy SDL drivers: import, Main() and the first board frame (background and pieces)
+GUI_STARTUP_SCRIPT = """
+import os, sys, time
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+start = time.perf_counter()
+import pygame
+from main import Main
+imported = time.perf_counter()
+app = Main(ai_mode=True)
+created = time.perf_counter()
+mixer_at_start = int(bool(pygame.mixer.get_init()))
+font_at_start = int(bool(pygame.font.get_init()))
+app.game.show_bg(app.screen)
+# The piece images are not part of the repository; without them only the background is drawn
+pieces_drawn = int(os.path.isdir('assets'))
+if pieces_drawn:
+    app.game.show_pieces(app.screen)
+first_frame = time.perf_counter()
+print(imported - start, created - imported, first_frame - created, mixer_at_start, font_at_start, pieces_drawn)
+"""
+
+
+def run_gui_startup(runs=5):
+    print(f"GUI cold start, best of {runs} runs")
+    samples = []
+    for _ in range(runs):
+        process = subprocess.run(
+            [sys.executable, "-c", GUI_STARTUP_SCRIPT],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        if process.returncode != 0:
+            print(f"skipped: {process.stderr.strip().splitlines()[-1]}")
+            return
+        samples.append(process.stdout.split())
+
+    print(f"import main        {min(float(sample[0]) for sample in samples) * 1000:8.1f} ms")
+    print(f"Main()             {min(float(sample[1]) for sample in samples) * 1000:8.1f} ms")
+    frame_label = "first board frame" if samples[0][5] == '1' else "board background"
+    print(f"{frame_label:<18} {min(float(sample[2]) for sample in samples) * 1000:8.1f} ms")
+    print(f"mixer initialized at start  {'yes' if samples[0][3] == '1' else 'no'}")
+    print(f"fonts initialized at start  {'yes' if samples[0][4] == '1' else 'no'}")
+
+
+def run_startup(depth, runs=5):
+    print(f"Engine cold start, best of {runs} runs (first move at depth {depth})")
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT.format(depth=depth)],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.split()
+        samples.append(output)
+
+    import_time = min(float(sample[0]) for sample in samples)
+    init_time = min(float(sample[1]) for sample in samples)
+    move_time = min(float(sample[2]) for sample in samples)
+    print(f"import ai, board   {import_time * 1000:8.1f} ms")
+    print(f"ChessAI()          {init_time * 1000:8.1f} ms")
+    print(f"first move         {move_time * 1000:8.1f} ms ({samples[0][3]} nodes)")
+    print(f"pygame imported    {'yes' if samples[0][4] == '1' else 'no'}")
+
+
+MULTIPV_POSITIONS = [
+    ("Italian", "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"),
+    ("QGD", "r2q1rk1/pp2bppp/2n1pn2/3p4/3P4/2NBPN2/PP3PPP/R2QK2R w KQ - 12 10"),
+]
+
+
+def run_multipv(depth, multipv=3):
+    print(f"Top {multipv} moves at depth {depth}: one multi-PV analysis vs {multipv} separate searches")
+    print(f"{'position':<10} {'multi-PV nodes':>15} {'separate nodes':>15}")
+    for name, fen in MULTIPV_POSITIONS:
+        board = chess.Board(fen)
+        ai = ChessAI(board.turn)
+        ai.get_top_moves(board, depth=depth, multipv=multipv)
+        multipv_nodes = ai.calculations_alpha_beta
+
+        # Each separate search excludes the best moves already found
+        separate_nodes = 0
+        excluded = []
+        for _ in range(multipv):
+            search_moves = [move for move in board.legal_moves if move not in excluded]
+            move, _ = ai.search(board, depth=depth, search_moves=search_moves)
+            separate_nodes += ai.calculations_alpha_beta
+            excluded.append(move)
+        print(f"{name:<10} {multipv_nodes:>15} {separate_nodes:>15}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ChessAI benchmarks")
+    parser.add_argument("suite", nargs="?", choices=["endgames", "startup", "multipv"], default="endgames", help="benchmark to run")
+    parser.add_argument("--depth", type=int, default=3, help="search depth of the AI")
+    args = parser.parse_args()
+    if args.suite == "startup":
+        run_startup(args.depth)
+        print()
+        run_gui_startup()
+    elif args.suite == "multipv":
+        run_multipv(args.depth)
+    else:
+        run_endgames(args.depth)
+
+
+if __name__ == "__main__":
+    main()
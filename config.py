@@ -10,9 +10,26 @@ class Config:
         self._add_themes()
         self.idx = 0
         self.theme = self.themes[self.idx]
-        self.font = pygame.font.SysFont('monospace', 18, bold=True)
+        # Fonts are created on first use: SysFont scans the installed system fonts
+        self._fonts = {}
         # Sound effects removed during refactoring to python-chess
 
+    @property
+    def font(self):
+        return self.get_font('monospace', 18, bold=True)
+
+    def get_font(self, name, size, bold=False):
+        """Return a cached font, creating it on first use (name None is pygame's default font)."""
+        key = (name, size, bold)
+        if key not in self._fonts:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            if name is None:
+                self._fonts[key] = pygame.font.Font(None, size)
+            else:
+                self._fonts[key] = pygame.font.SysFont(name, size, bold=bold)
+        return self._fonts[key]
+
     def change_theme(self):
         self.idx += 1
         self.idx %= len(self.themes)
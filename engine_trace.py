@@ -0,0 +1,49 @@
+import json
+
+import chess
+
+
+class TraceRecorder:
+    """Append every AI decision to a JSONL trace file.
+
+    Each record holds the position (with the moves leading to it, so
+    repetitions are detected the same way on replay), the engine settings and
+    the chosen move, node count, search time and depth.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'a', buffering=1)
+
+    def record(self, board, color, move, nodes, elapsed, depth, settings):
+        entry = {
+            'fen': board.fen(),
+            'root_fen': board.root().fen(),
+            'moves': [m.uci() for m in board.move_stack],
+            'color': 'white' if color == chess.WHITE else 'black',
+            'move': move.uci() if move else None,
+            'nodes': nodes,
+            'time': round(elapsed, 6),
+            'depth': depth,
+            'settings': settings
+        }
+        self.file.write(json.dumps(entry) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+def read_trace(path):
+    """Yield the records of a trace file one at a time."""
+    with open(path) as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def board_from_record(record):
+    """Rebuild the board of a record, including its move history."""
+    board = chess.Board(record['root_fen'])
+    for uci in record['moves']:
+        board.push(chess.Move.from_uci(uci))
+    return board
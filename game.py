@@ -2,25 +2,50 @@ import pygame
 import chess
 from board import Board
 from config import Config
-from ai import ChessAI
+from ai import ChessAI, static_exchange
+from engine_trace import TraceRecorder
 import os
 
 class Game:
-    def __init__(self, ai_enabled=False):
-        pygame.mixer.init()  # Initialize sound mixer
-        
-        # Load sound effects
-        base_path = os.path.join(os.path.dirname(__file__), '..', 'assets', 'sounds')
-        self.move_sound = pygame.mixer.Sound(os.path.join(base_path, 'move.wav'))
-        self.capture_sound = pygame.mixer.Sound(os.path.join(base_path, 'capture.wav'))
+    def __init__(self, ai_enabled=False, deterministic=False, trace_path=None):
+        # Sound effects and piece images are loaded on first use
+        self._sounds = {}
+        self._images = {}
         
         self.board = Board()
         self.config = Config()
         self.selected_square = None
         self.legal_moves = self.board.get_legal_moves()
         self.ai_enabled = ai_enabled
-        self.ai = ChessAI(chess.BLACK) if ai_enabled else None
+        recorder = TraceRecorder(trace_path) if ai_enabled and trace_path else None
+        self.ai = ChessAI(chess.BLACK, deterministic=deterministic, recorder=recorder) if ai_enabled else None
         self.ai_turn = False
+        self.show_exchange = False  # Color captures by static exchange evaluation
+
+    def _get_sound(self, name):
+        """Load a sound effect, initializing the sound mixer on first use."""
+        if name not in self._sounds:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()  # Initialize sound mixer
+            base_path = os.path.join(os.path.dirname(__file__), '..', 'assets', 'sounds')
+            self._sounds[name] = pygame.mixer.Sound(os.path.join(base_path, f'{name}.wav'))
+        return self._sounds[name]
+
+    @property
+    def move_sound(self):
+        return self._get_sound('move')
+
+    @property
+    def capture_sound(self):
+        return self._get_sound('capture')
+
+    def _get_piece_image(self, color, piece_name):
+        """Load a piece image once and reuse it on every frame."""
+        key = (color, piece_name)
+        if key not in self._images:
+            img_path = f'assets/images/imgs-80px/{"white" if color else "black"}_{piece_name}.png'
+            self._images[key] = pygame.image.load(img_path)
+        return self._images[key]
 
     def show_bg(self, surface):
         theme = self.config.theme
@@ -41,7 +66,7 @@ class Game:
                 pygame.draw.rect(surface, color, rect)
         
         # Render coordinate notation
-        font = pygame.font.Font(None, 24)
+        font = self.config.get_font(None, 24)
         
         # Column letters (A-H)
         for col in range(8):
@@ -72,14 +97,13 @@ class Game:
                     'k': 'king',
                     'p': 'pawn'
                 }[piece_symbol]
-                img_path = f'assets/images/imgs-80px/{"white" if piece.color else "black"}_{piece_name}.png'
-                img = pygame.image.load(img_path)
+                img = self._get_piece_image(piece.color, piece_name)
                 img_center = col * 80 + 40, row * 80 + 40
                 img_rect = img.get_rect(center=img_center)
                 surface.blit(img, img_rect)
 
     def show_captures(self, surface, from_square):
-        """Draw red squares for pieces that can be captured"""
+        """Draw red squares for pieces that can be captured (green for winning or even exchanges if show_exchange is on)"""
         for move in self.board.board.legal_moves:
             if move.from_square == from_square:
                 to_square = move.to_square
@@ -91,8 +115,11 @@ class Game:
                 
                 # If there is an opponent's piece, fill the entire square with red
                 if target_piece is not None and target_piece.color != self.board.board.turn:
+                    color = (255, 150, 150)  # Light red
+                    if self.show_exchange and static_exchange(self.board.board, move) >= 0:
+                        color = (150, 220, 150)  # Light green: the capture does not lose material
                     rect = pygame.Rect(col * 80, row * 80, 80, 80)
-                    pygame.draw.rect(surface, (255, 150, 150), rect)  # Fill the entire square with light red
+                    pygame.draw.rect(surface, color, rect)  # Fill the entire square
                     
     def show_move_dots(self, surface, from_square):
         """Draw yellow dots for squares that can be moved to"""
@@ -11,17 +11,19 @@ WIDTH, HEIGHT = 640, 640
 SQSIZE = 80
 
 class Main:
-    def __init__(self, ai_mode=True, ai_depth=3, use_alpha_beta=True):
-        pygame.init()
+    def __init__(self, ai_mode=True, ai_depth=3, use_alpha_beta=True, max_nodes=None, deterministic=False, trace_path=None):
+        # Only the display is initialized here; fonts and the sound mixer are initialized on first use
+        pygame.display.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption('Chess')
-        self.game = Game(ai_enabled=ai_mode)
+        self.game = Game(ai_enabled=ai_mode, deterministic=deterministic, trace_path=trace_path)
         self.selected_square = None  # Store selected square (index 0-63)
         self.running = True
         self.ai_mode = ai_mode
-        self.last_player_move_time = pygame.time.get_ticks()
+        self.last_player_move_time = time.monotonic()
         self.ai_depth = ai_depth  # Default depth of AI
         self.use_alpha_beta = use_alpha_beta  # Default value for Alpha-Beta algorithm
+        self.max_nodes = max_nodes  # Node budget per AI move (None: fixed depth search)
         self.ai_calculation_time = 0  # Time taken for AI to calculate its move
 
 
@@ -36,8 +38,8 @@ class Main:
         self.screen.blit(overlay, (0, 0))
         
         # Prepare text with background
-        font_large = pygame.font.SysFont('Arial', 36)
-        font_small = pygame.font.SysFont('Arial', 20)
+        font_large = self.game.config.get_font('Arial', 36)
+        font_small = self.game.config.get_font('Arial', 20)
         
         # Create background for text
         bg_height = 80
@@ -89,7 +91,7 @@ class Main:
 
     def mainloop(self):
         while self.running:
-            current_time = pygame.time.get_ticks()
+            current_time = time.monotonic()
             self.screen.fill((0, 0, 0))
             self.game.show_bg(self.screen)
             
@@ -107,7 +109,7 @@ class Main:
             if (self.ai_mode and 
                 self.game.board.board.turn == chess.BLACK and 
                 self.selected_square is None and 
-                current_time - self.last_player_move_time > 1000):  # Wait 1 second after player move
+                current_time - self.last_player_move_time > 1.0):  # Wait 1 second after player move
                 
                 # Start timing AI calculation
                 ai_start_time = time.time()
@@ -115,7 +117,8 @@ class Main:
                 ai_move, calculations, calculations_alpha_beta = self.game.ai.choose_move(
                     self.game.board.board, 
                     use_alpha_beta=self.use_alpha_beta,
-                    depth=self.ai_depth  # Use current depth
+                    depth=self.ai_depth,  # Use current depth
+                    max_nodes=self.max_nodes
                 )
                 
                 # End timing and store calculation time
@@ -160,7 +163,7 @@ class Main:
                         'squares': self.last_move,
                         'color': 'black'
                     }
-                    pygame.time.delay(500)  # Slight delay to show AI's thinking
+                    time.sleep(0.5)  # Slight delay to show AI's thinking
             
             # Draw red squares for opponent's pieces that can be captured
             if self.selected_square is not None:
@@ -174,13 +177,13 @@ class Main:
                 self.game.show_move_dots(self.screen, self.selected_square)
             
             # Display player turn only
-            font = pygame.font.SysFont('Arial', 20)
+            font = self.game.config.get_font('Arial', 20)
             turn_text = "Turn: " + ("White (Player 1)" if self.game.board.board.turn == chess.WHITE else "Black (Player 2)")
             turn_render = font.render(turn_text, True, (255, 255, 255))
             self.screen.blit(turn_render, (10, 10))
             
             # Display AI depth
-            font = pygame.font.SysFont('Arial', 20)
+            font = self.game.config.get_font('Arial', 20)
             ai_depth_text = f"AI Depth: {self.ai_depth}"
             ai_depth_render = font.render(ai_depth_text, True, (255, 255, 255))
             self.screen.blit(ai_depth_render, (10, 40))
@@ -231,7 +234,7 @@ class Main:
                                     'color': 'white' if self.game.board.board.turn == chess.BLACK else 'black'
                                 }
                                 self.selected_square = None
-                                self.last_player_move_time = pygame.time.get_ticks()  # Update last move time
+                                self.last_player_move_time = time.monotonic()  # Update last move time
                             else:
                                 # If invalid, reselect
                                 if piece and piece.color == self.game.board.board.turn:
@@ -258,6 +261,12 @@ class Main:
                             self.ai_depth -= 1
                             print(f"\nAI depth decreased to {self.ai_depth}")
                     
+                    # Show whether highlighted captures win or lose material with key e
+                    if event.key == pygame.K_e:
+                        self.game.show_exchange = not self.game.show_exchange
+                        state = "on" if self.game.show_exchange else "off"
+                        print(f"\nCapture exchange evaluation {state}")
+
                     # Chuyển đổi giữa Alpha-Beta và Minimax thông thường với phím a
                     if event.key == pygame.K_a:
                         self.use_alpha_beta = not self.use_alpha_beta
@@ -0,0 +1,68 @@
+import argparse
+import sys
+import time
+
+import chess
+
+from ai import ChessAI
+from engine_trace import read_trace, board_from_record
+
+
+def replay_record(record):
+    """Re-run one recorded decision and return (move, nodes, time, depth)."""
+    settings = record['settings']
+    board = board_from_record(record)
+    color = chess.WHITE if record['color'] == 'white' else chess.BLACK
+    ai = ChessAI(color, tapered_eval=settings['tapered_eval'], contempt=settings['contempt'],
+                 deterministic=settings['deterministic'])
+
+    start = time.perf_counter()
+    move, calculations, calculations_alpha_beta = ai.choose_move(
+        board,
+        use_alpha_beta=settings['use_alpha_beta'],
+        depth=settings['depth'],
+        max_nodes=settings['max_nodes']
+    )
+    elapsed = time.perf_counter() - start
+    nodes = calculations_alpha_beta if settings['use_alpha_beta'] else calculations
+    return move.uci() if move else None, nodes, elapsed, ai.depth_reached
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run a ChessAI trace and report moves and node counts that changed")
+    parser.add_argument("trace", help="JSONL trace written by TraceRecorder")
+    parser.add_argument("--verbose", action="store_true", help="print every decision, not only the differences")
+    args = parser.parse_args()
+
+    decisions = 0
+    move_diffs = 0
+    node_diffs = 0
+    recorded_time = 0.0
+    replayed_time = 0.0
+
+    for index, record in enumerate(read_trace(args.trace)):
+        move, nodes, elapsed, depth = replay_record(record)
+        decisions += 1
+        recorded_time += record['time']
+        replayed_time += elapsed
+
+        changed = []
+        if move != record['move']:
+            move_diffs += 1
+            changed.append(f"move {record['move']} -> {move}")
+        if nodes != record['nodes']:
+            node_diffs += 1
+            changed.append(f"nodes {record['nodes']} -> {nodes}")
+        if changed or args.verbose:
+            status = ", ".join(changed) if changed else "same"
+            print(f"#{index} {record['fen']} depth {record['depth']} -> {depth}: {status}")
+
+    print(f"{decisions} decisions, {move_diffs} moves and {node_diffs} node counts differ")
+    if decisions:
+        print(f"search time: recorded {recorded_time:.3f}s, replayed {replayed_time:.3f}s "
+              f"({replayed_time / recorded_time if recorded_time else 0:.2f}x)")
+    sys.exit(1 if move_diffs or node_diffs else 0)
+
+
+if __name__ == "__main__":
+    main()